@@ -12,10 +12,14 @@ Features:
 All processing is done in-memory. No data is stored.
 """
 
+import re
 from dataclasses import dataclass, field
+from datetime import datetime
 from typing import List, Dict, Optional
 from enum import Enum
 
+from models import BillRecord
+
 
 class BillType(Enum):
     """Type of bill - Sales or Purchase."""
@@ -102,6 +106,22 @@ class InventoryAnalyzer:
     # Threshold for low stock warning
     LOW_STOCK_THRESHOLD = 10
     
+    # Date formats tried (in order) when normalizing bill dates
+    DATE_FORMATS = (
+        "%d/%m/%Y",
+        "%d-%m-%Y",
+        "%Y-%m-%d",
+        "%d %b %Y",
+        "%d %B %Y",
+        # Support for "8-Apr-25" type formats
+        "%d-%b-%y",
+        "%d-%b-%Y",
+    )
+    
+    # Fallback for unparseable strings that still look like a date
+    # (compiled once instead of on every call)
+    DATE_LIKE_PATTERN = re.compile(r'\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4}')
+    
     # Keywords to detect bill type
     SALES_KEYWORDS = [
         'sold to', 'customer', 'invoice to', 'bill to', 
@@ -139,15 +159,17 @@ class InventoryAnalyzer:
     
     def analyze(
         self,
-        purchase_data: List[Dict],
-        sales_data: List[Dict]
+        purchase_data: List[BillRecord],
+        sales_data: List[BillRecord]
     ) -> InventoryAnalysis:
         """
         Analyze inventory from purchase and sales data.
         
         Args:
             purchase_data: List of extracted data from purchase bills
-                Each dict has: line_items, subtotal, tax, total, etc.
+                Each record has: line_items, subtotal, tax, total, etc.
+                (read with BillRecord.get, which also returns the default
+                for fields stored as None)
             sales_data: List of extracted data from sales bills
             
         Returns:
@@ -243,12 +265,12 @@ class InventoryAnalyzer:
         
         return result
     
-    def _extract_dates(self, bill_data: List[Dict]) -> List[str]:
+    def _extract_dates(self, bill_data: List[BillRecord]) -> List[str]:
         """
         Extract all dates from bill data.
         
         Args:
-            bill_data: List of bill dictionaries
+            bill_data: List of bill records
             
         Returns:
             List of date strings found
@@ -276,27 +298,13 @@ class InventoryAnalyzer:
         Returns:
             Normalized date string (DD/MM/YYYY) or None if parsing fails
         """
-        import re
-        from datetime import datetime
-        
         if not date_str:
             return None
         
         date_str = date_str.strip()
         
         # Try various formats
-        formats = [
-            ("%d/%m/%Y", r'\d{1,2}/\d{1,2}/\d{4}'),
-            ("%d-%m-%Y", r'\d{1,2}-\d{1,2}-\d{4}'),
-            ("%Y-%m-%d", r'\d{4}-\d{1,2}-\d{1,2}'),
-            ("%d %b %Y", r'\d{1,2}\s+\w{3}\s+\d{4}'),
-            ("%d %B %Y", r'\d{1,2}\s+\w+\s+\d{4}'),
-            # Support for "8-Apr-25" type formats
-            ("%d-%b-%y", r'\d{1,2}-\w{3}-\d{2}'),
-            ("%d-%b-%Y", r'\d{1,2}-\w{3}-\d{4}'),
-        ]
-        
-        for fmt, pattern in formats:
+        for fmt in self.DATE_FORMATS:
             try:
                 # Try to parse
                 dt = datetime.strptime(date_str, fmt)
@@ -306,7 +314,7 @@ class InventoryAnalyzer:
                 continue
         
         # If all formats fail, return original if it looks like a date
-        if re.match(r'\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4}', date_str):
+        if self.DATE_LIKE_PATTERN.match(date_str):
             return date_str
         
         return None
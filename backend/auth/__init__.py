@@ -4,7 +4,7 @@ Auth Module
 Handles authentication, authorization, and database connections.
 """
 
-from .database import get_database, get_users_collection
+from .database import get_database, get_users_collection, ensure_indexes
 from .security import (
     verify_password,
     get_password_hash,
@@ -16,6 +16,7 @@ from .dependencies import get_current_user, get_current_admin_user
 __all__ = [
     "get_database",
     "get_users_collection",
+    "ensure_indexes",
     "verify_password",
     "get_password_hash",
     "create_access_token",
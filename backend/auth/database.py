@@ -5,7 +5,9 @@ Handles async MongoDB connection using Motor driver.
 """
 
 import os
+import time
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import OperationFailure
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -17,6 +19,20 @@ MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME", "dattu_bill")
 # Global database client (lazy initialization)
 _client: AsyncIOMotorClient = None
 _database = None
+_users_collection = None
+
+# Users collection indexes (name, keys, options)
+USER_INDEXES = (
+    ("username", "username", {"unique": True}),
+    ("email", "email", {"unique": True}),
+    ("session status", [("is_logged_in", 1), ("last_activity", 1)], {}),
+)
+
+# Seconds to wait before retrying index builds that failed
+INDEX_RETRY_INTERVAL_SECONDS = 60
+
+_user_indexes_ready = False
+_next_index_attempt = 0.0
 
 
 async def get_database():
@@ -40,20 +56,71 @@ async def get_database():
 async def get_users_collection():
     """
     Get the users collection.
+    The handle is cached so request handlers skip the lookup. Indexes are
+    ensured on first use; if any build fails it is retried on a later
+    call (at most once per INDEX_RETRY_INTERVAL_SECONDS).
     
     Returns:
         AsyncIOMotorCollection: The users collection
     """
-    db = await get_database()
-    return db["users"]
+    global _users_collection, _user_indexes_ready, _next_index_attempt
+    
+    if _users_collection is None:
+        db = await get_database()
+        _users_collection = db["users"]
+    
+    if not _user_indexes_ready and time.monotonic() >= _next_index_attempt:
+        _next_index_attempt = time.monotonic() + INDEX_RETRY_INTERVAL_SECONDS
+        _user_indexes_ready = await _create_user_indexes(_users_collection)
+    
+    return _users_collection
+
+
+async def _create_user_indexes(users_collection) -> bool:
+    """
+    Create the indexes the users collection relies on.
+    
+    - Unique username/email: auth lookups are B-tree hits, and duplicate
+      registrations fail at the storage layer even under concurrent requests
+    - (is_logged_in, last_activity): supports session status queries
+    
+    Each index is built separately so one failure doesn't skip the others.
+    Safe to call repeatedly - existing indexes are left untouched.
+    
+    Returns:
+        True if every index exists, False if any build failed
+    """
+    all_created = True
+    for name, keys, options in USER_INDEXES:
+        try:
+            await users_collection.create_index(keys, **options)
+        except OperationFailure as e:
+            # e.g. existing duplicate data - keep serving, retry later
+            all_created = False
+            print(f"[DATABASE] ERROR: Could not create users {name} index "
+                  f"(retrying in {INDEX_RETRY_INTERVAL_SECONDS}s): {e}")
+    
+    if all_created:
+        print("[DATABASE] Users collection indexes ensured")
+    return all_created
+
+
+async def ensure_indexes():
+    """
+    Eagerly create the users collection indexes (call on app startup).
+    """
+    await get_users_collection()
 
 
 async def close_database():
     """Close the database connection."""
-    global _client, _database
+    global _client, _database, _users_collection, _user_indexes_ready, _next_index_attempt
     
     if _client is not None:
         _client.close()
         _client = None
         _database = None
+        _users_collection = None
+        _user_indexes_ready = False
+        _next_index_attempt = 0.0
         print("[DATABASE] MongoDB connection closed")
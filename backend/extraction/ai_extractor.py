@@ -15,8 +15,9 @@ All processing is done in-memory. No data is stored or logged.
 
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Tuple
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -26,7 +27,7 @@ load_dotenv()
 from groq import Groq
 
 
-@dataclass
+@dataclass(slots=True)
 class LineItem:
     """
     Represents a single line item from an invoice/bill.
@@ -81,6 +82,8 @@ class ExtractedData:
         tax: Total tax amount (cgst + sgst or igst)
         total: Final total amount
         extraction_notes: Any notes about the extraction process
+        extraction_failed: True if the AI call or response parsing failed
+            (the data is then empty and must not be treated as a real bill)
     """
     invoice_number: str = ""
     date: str = ""
@@ -94,6 +97,21 @@ class ExtractedData:
     tax: float = 0.0
     total: float = 0.0
     extraction_notes: List[str] = field(default_factory=list)
+    extraction_failed: bool = False
+
+
+def _to_float(value, default: float = 0.0) -> float:
+    """
+    Convert a value from the AI response to float.
+    
+    Same result as float(value or default), but floats (the usual case
+    for JSON output) are returned as-is without a conversion call.
+    """
+    if not value:
+        return float(default)
+    if isinstance(value, float):
+        return value
+    return float(value)
 
 
 class AIExtractor:
@@ -106,9 +124,16 @@ class AIExtractor:
     This class is designed to be stateless - no data is cached or stored.
     """
     
+    # Default cap on concurrent Groq requests issued by extract_batch
+    # (kept low for free-tier rate limits; override with GROQ_MAX_CONCURRENT_REQUESTS)
+    DEFAULT_MAX_CONCURRENT_REQUESTS = 2
+    
     def __init__(self):
         """Initialize the AI extractor with Groq client."""
         self.model = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+        self.max_concurrent_requests = max(1, int(os.getenv(
+            "GROQ_MAX_CONCURRENT_REQUESTS", self.DEFAULT_MAX_CONCURRENT_REQUESTS
+        )))
         api_key = os.getenv("GROQ_API_KEY")
         
         if not api_key:
@@ -117,6 +142,26 @@ class AIExtractor:
         self.groq_client = Groq(api_key=api_key)
         print(f"[AI_EXTRACTOR] Groq AI initialized with model: {self.model}")
     
+    def extract_batch(self, items: List[Tuple[str, list]]) -> List[ExtractedData]:
+        """
+        Extract structured data from multiple documents in one call.
+        
+        Groq requests are issued concurrently (bounded by
+        max_concurrent_requests) instead of one after another.
+        
+        Args:
+            items: List of (text_content, tables) tuples, one per document
+            
+        Returns:
+            List of ExtractedData objects in the same order as items
+        """
+        if len(items) <= 1:
+            return [self.extract(text_content, tables) for text_content, tables in items]
+        
+        max_workers = min(self.max_concurrent_requests, len(items))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda item: self.extract(*item), items))
+    
     def extract(self, text_content: str, tables: list = None) -> ExtractedData:
         """
         Extract structured data from document text using AI.
@@ -242,9 +287,9 @@ Perform this deep analysis now. Return ONLY valid JSON."""
             data = json.loads(response_text)
             
             # Convert to ExtractedData with pricing and GST
-            cgst = float(data.get("cgst", 0) or 0)
-            sgst = float(data.get("sgst", 0) or 0)
-            igst = float(data.get("igst", 0) or 0)
+            cgst = _to_float(data.get("cgst"), 0)
+            sgst = _to_float(data.get("sgst"), 0)
+            igst = _to_float(data.get("igst"), 0)
             # Total tax is sum of GST components
             total_tax = cgst + sgst + igst
             
@@ -252,12 +297,12 @@ Perform this deep analysis now. Return ONLY valid JSON."""
                 invoice_number=data.get("invoice_number", ""),
                 date=data.get("date", ""),
                 vendor_name=data.get("vendor_name", ""),
-                subtotal=float(data.get("subtotal", 0) or 0),
+                subtotal=_to_float(data.get("subtotal"), 0),
                 cgst=cgst,
                 sgst=sgst,
                 igst=igst,
                 tax=total_tax,
-                total=float(data.get("total", 0) or 0),
+                total=_to_float(data.get("total"), 0),
                 extraction_notes=["Extracted using Groq AI"]
             )
             
@@ -276,10 +321,10 @@ Perform this deep analysis now. Return ONLY valid JSON."""
             
             # Parse line items with pricing and discount percentage
             for item in data.get("line_items", []):
-                qty = float(item.get("quantity", 1) or 1)
-                rate = float(item.get("rate", 0) or 0)
-                discount_percent = float(item.get("discount_percent", 0) or 0)
-                amount = float(item.get("amount", 0) or 0)
+                qty = _to_float(item.get("quantity"), 1)
+                rate = _to_float(item.get("rate"), 0)
+                discount_percent = _to_float(item.get("discount_percent"), 0)
+                amount = _to_float(item.get("amount"), 0)
                 item_name = item.get("item_name", "Unknown")
                 
                 # If amount is 0 but we have qty and rate, calculate it with percentage discount
@@ -319,9 +364,9 @@ Perform this deep analysis now. Return ONLY valid JSON."""
             # Parse additional_charges from AI response
             for charge in data.get("additional_charges", []):
                 charge_name = charge.get("charge_name", "")
-                charge_amount = float(charge.get("amount", 0) or 0)
-                charge_qty = float(charge.get("quantity", 0) or 0)
-                charge_rate = float(charge.get("rate", 0) or 0)
+                charge_amount = _to_float(charge.get("amount"), 0)
+                charge_qty = _to_float(charge.get("quantity"), 0)
+                charge_rate = _to_float(charge.get("rate"), 0)
                 
                 if charge_name and charge_amount > 0:
                     result.additional_charges.append(AdditionalCharge(
@@ -350,12 +395,12 @@ Perform this deep analysis now. Return ONLY valid JSON."""
             
         except json.JSONDecodeError as e:
             print(f"[AI_EXTRACTOR] Failed to parse AI response as JSON: {e}")
-            result = ExtractedData()
+            result = ExtractedData(extraction_failed=True)
             result.extraction_notes.append(f"JSON parsing error: {e}")
             return result
         except Exception as e:
             print(f"[AI_EXTRACTOR] AI extraction failed: {e}")
-            result = ExtractedData()
+            result = ExtractedData(extraction_failed=True)
             result.extraction_notes.append(f"Extraction error: {e}")
             return result
 
@@ -22,6 +22,7 @@ from openpyxl.utils.dataframe import dataframe_to_rows
 
 from extraction import ExtractedData
 from validation import ValidationResult
+from models import BillRecord
 
 
 class ExcelGenerator:
@@ -139,7 +140,7 @@ class ExcelGenerator:
         rows = [
             ("Source File", original_filename or "Uploaded Document", "", ""),
             ("Processing Date", datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "", ""),
-            ("Overall Status", overall_status, overall_status, f"{len(validation.errors)} errors, {len(validation.warnings)} warnings"),
+            ("Overall Status", overall_status, overall_status, f"{len(validation.errors or ())} errors, {len(validation.warnings or ())} warnings"),
             ("", "", "", ""),  # Empty row
             ("Invoice/Bill Number", data.invoice_number or "Not found", "Warning" if not data.invoice_number else "OK", ""),
             ("Date", data.date or "Not found", "Warning" if not data.date else "OK", ""),
@@ -283,7 +284,7 @@ class ExcelGenerator:
         row_num = 2
         
         # Errors
-        for error in validation.errors:
+        for error in validation.errors or ():
             type_cell = ws.cell(row=row_num, column=1, value="ERROR")
             type_cell.fill = self.ERROR_FILL
             type_cell.border = self.BORDER
@@ -292,7 +293,7 @@ class ExcelGenerator:
             row_num += 1
         
         # Warnings
-        for warning in validation.warnings:
+        for warning in validation.warnings or ():
             type_cell = ws.cell(row=row_num, column=1, value="WARNING")
             type_cell.fill = self.WARNING_FILL
             type_cell.border = self.BORDER
@@ -320,8 +321,8 @@ class ExcelGenerator:
     def generate_analysis_report(
         self,
         analysis,  # InventoryAnalysis object
-        purchase_bills: List[dict],
-        sales_bills: List[dict]
+        purchase_bills: List[BillRecord],
+        sales_bills: List[BillRecord]
     ) -> bytes:
         """
         Generate comprehensive analysis Excel from purchase and sales data.
@@ -542,12 +543,15 @@ class ExcelGenerator:
     def _create_bills_sheet(
         self, 
         wb: Workbook, 
-        bills: List[dict], 
+        bills: List[BillRecord], 
         sheet_name: str,
         bill_type: str
     ):
         """
         Create sheet with all bill line items including prices, discount, and GST.
+        
+        Bills are read with BillRecord.get, which (unlike dict.get) also
+        returns the default for fields stored as None.
         """
         ws = wb.create_sheet(sheet_name)
         
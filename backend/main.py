@@ -7,7 +7,7 @@ Key Features:
 - Stateless, synchronous API
 - Privacy-first: ZERO data storage
 - All processing in-memory
-- Streaming Excel response
+- Excel report returned directly from memory
 - Sales/Purchase bill analysis with surplus/deficit
 
 Endpoints:
@@ -16,65 +16,192 @@ Endpoints:
 Author: Antigravity AI Platform
 """
 
-import io
+import os
 import gc
+import time
+import asyncio
+import multiprocessing
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Optional, List
 from datetime import datetime
 
+import orjson
 from fastapi import FastAPI, UploadFile, File, HTTPException, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response
 
 # Import processing modules
 from parsers import DocumentParser
 from extraction import AIExtractor
-from validation import Validator
+from validation import DEFAULT_VALIDATOR
 from generators import ExcelGenerator
 from analysis import InventoryAnalyzer
+from models import BillRecord
 
 # Import authentication routes
 from routes.auth import router as auth_router
+from auth import ensure_indexes
 
 
 # ============================================================================
 # Application Setup
 # ============================================================================
 
+async def create_database_indexes():
+    """Make sure the users collection indexes exist."""
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        print(f"[DATABASE] Could not ensure indexes: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application startup and shutdown.
+    
+    Indexes are built in the background so an unreachable MongoDB doesn't
+    hold up serving (bill analysis doesn't need the database).
+    Worker processes are stopped on shutdown.
+    """
+    index_task = asyncio.create_task(create_database_indexes())
+    yield
+    index_task.cancel()
+    process_pool.shutdown(wait=False, cancel_futures=True)
+
+
 app = FastAPI(
     title="Document-to-Excel Processor",
     description="Privacy-first API for converting invoices and bills to structured Excel files",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware for frontend integration
 # Explicitly list allowed origins to avoid browser blocking
+# (wildcard is only added when DEV is set)
 origins = [
     "http://localhost:5173",
-    "http://127.0.0.1:5173", 
+    "http://127.0.0.1:5173",
     "https://dattu-stock-management-qww1.onrender.com",  # Your production frontend
-    "*"
-]
+] + (["*"] if os.getenv("DEV") else [])
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PATCH", "DELETE"],
+    allow_headers=["Content-Type", "Authorization"],
 )
 
+# Gzip responses over 64 KB (in practice large JSON payloads; Excel reports
+# are already deflate-compressed and are normally well below the threshold).
+# Level 1 keeps compression cheap.
+app.add_middleware(GZipMiddleware, minimum_size=64 * 1024, compresslevel=1)
+
 # Include authentication routes
 app.include_router(auth_router)
 
 # Initialize processing components (stateless)
 document_parser = DocumentParser()
 ai_extractor = AIExtractor()
-validator = Validator()
+validator = DEFAULT_VALIDATOR
 excel_generator = ExcelGenerator()
 inventory_analyzer = InventoryAnalyzer()
 
+# Worker pool for CPU-bound work (document parsing and Excel generation).
+# Keeps the event loop free; with more workers, uploaded documents parse in parallel.
+# Each worker costs roughly 90 MB on top of the ~120 MB server process, so the
+# default of 1 fits a 512 MB instance. Set PROCESS_POOL_WORKERS to raise it.
+PROCESS_POOL_WORKERS = max(1, int(os.getenv("PROCESS_POOL_WORKERS", "1")))
+
+# Workers are started from a forkserver (spawn where that is unavailable):
+# forking this process directly copies it mid-flight with motor/anyio threads
+# running, which can deadlock the child.
+PROCESS_POOL_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def _new_process_pool() -> ProcessPoolExecutor:
+    """Create the worker pool used for parsing and Excel generation."""
+    return ProcessPoolExecutor(
+        max_workers=PROCESS_POOL_WORKERS,
+        mp_context=multiprocessing.get_context(PROCESS_POOL_START_METHOD)
+    )
+
+
+process_pool = _new_process_pool()
+
+
+# ============================================================================
+# Helpers
+# ============================================================================
+
+def _replace_broken_pool(pool: ProcessPoolExecutor):
+    """Swap in a fresh worker pool if `pool` is still the current one."""
+    global process_pool
+    
+    # Concurrent callers share the broken pool - only the first replaces it
+    if process_pool is pool:
+        print("[WORKERS] Process pool broken, starting a new one")
+        pool.shutdown(wait=False, cancel_futures=True)
+        process_pool = _new_process_pool()
+
+
+async def _run_in_process_pool(func, *args):
+    """
+    Run func(*args) in the worker pool without blocking the event loop.
+    
+    A worker that dies (e.g. crashes on a malformed upload or is OOM-killed)
+    leaves the pool unusable for every later call, so the pool is replaced.
+    Only submissions rejected by an already-broken pool are retried; a job
+    whose worker died is failed, not re-run, since a crashing input would
+    just break the new pool as well.
+    """
+    loop = asyncio.get_running_loop()
+    pool = process_pool
+    try:
+        future = loop.run_in_executor(pool, func, *args)
+    except BrokenProcessPool:
+        # Broken by an earlier call - this job never started, so resubmit it
+        _replace_broken_pool(pool)
+        pool = process_pool
+        future = loop.run_in_executor(pool, func, *args)
+    
+    try:
+        return await future
+    except BrokenProcessPool:
+        _replace_broken_pool(pool)
+        raise
+
+
+@lru_cache(maxsize=1)
+def _filename_timestamp(epoch_second: int) -> str:
+    """Local timestamp used in report filenames (formatted once per second)."""
+    return datetime.fromtimestamp(epoch_second).strftime("%Y%m%d_%H%M%S")
+
+
+@lru_cache(maxsize=1)
+def _health_payload(epoch_second: int) -> dict:
+    """Health check body (built once per second)."""
+    return {
+        "status": "healthy",
+        "timestamp": datetime.utcfromtimestamp(epoch_second).isoformat(),
+        "components": {
+            "parser": "ready",
+            "extractor": "ready",
+            "validator": "ready",
+            "generator": "ready"
+        }
+    }
+
 
 # ============================================================================
 # API Endpoints
@@ -100,16 +227,7 @@ async def health_check():
     """
     Detailed health check for monitoring.
     """
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "components": {
-            "parser": "ready",
-            "extractor": "ready",
-            "validator": "ready",
-            "generator": "ready"
-        }
-    }
+    return _health_payload(int(time.time()))
 
 
 
@@ -148,116 +266,113 @@ async def analyze_bills(
     purchase_data = []
     sales_data = []
     
+    # Parse jobs running in worker processes: (filename, is_sales_file, task)
+    parse_jobs = []
+    
+    # Successfully parsed bills awaiting extraction: (filename, parse_result, is_sales_file)
+    parsed_bills = []
+    
+    loop = asyncio.get_running_loop()
+    
     try:
-        # Process purchase files
+        # Queue purchase files for parsing
         for file in purchase_files:
             try:
                 file_bytes = await file.read()
                 if len(file_bytes) == 0:
                     continue
-                    
-                parse_result = document_parser.parse(file_bytes, file.filename)
                 
                 # DEBUG: Print what was extracted from PDF
                 print(f"Processing Purchase File: {file.filename}")
                 
-                if parse_result.success:
-                    extracted = ai_extractor.extract(
-                        parse_result.text_content,
-                        parse_result.tables
-                    )
-                    
-                    purchase_data.append({
-                        'invoice_number': extracted.invoice_number,
-                        'date': extracted.date,
-                        'vendor_name': extracted.vendor_name,
-                        'line_items': extracted.line_items,
-                        'additional_charges': extracted.additional_charges,
-                        'subtotal': extracted.subtotal,
-                        'cgst': extracted.cgst,
-                        'sgst': extracted.sgst,
-                        'igst': extracted.igst,
-                        'tax': extracted.tax,
-                        'total': extracted.total
-                    })
-                else:
-                    raise HTTPException(
-                        status_code=422,
-                        detail=f"Error reading file '{file.filename}': {parse_result.error_message}. Please upload a valid PDF or Excel."
-                    )
-            except HTTPException:
-                raise
+                parse_jobs.append((file.filename, False, asyncio.create_task(
+                    _run_in_process_pool(document_parser.parse, file_bytes, file.filename)
+                )))
             except Exception as e:
                 raise HTTPException(
                     status_code=422,
                     detail=f"Error processing file '{file.filename}': {str(e)}"
                 )
         
-        # Process sales files
+        # Queue sales files for parsing
         for file in sales_files:
             try:
                 file_bytes = await file.read()
                 if len(file_bytes) == 0:
                     continue
-                    
-                parse_result = document_parser.parse(file_bytes, file.filename)
                 
                 print(f"Processing Sales File: {file.filename}")
                 
-                if parse_result.success:
-                    extracted = ai_extractor.extract(
-                        parse_result.text_content,
-                        parse_result.tables
-                    )
-                    
-                    # Auto-detect bill type if enabled
-                    if auto_detect:
-                        detected_type = inventory_analyzer.detect_bill_type(
-                            parse_result.text_content
-                        )
-                        # Override if detected as purchase
-                        if detected_type.value == 'purchase':
-                            purchase_data.append({
-                                'invoice_number': extracted.invoice_number,
-                                'date': extracted.date,
-                                'vendor_name': extracted.vendor_name,
-                                'line_items': extracted.line_items,
-                                'additional_charges': extracted.additional_charges,
-                                'subtotal': extracted.subtotal,
-                                'cgst': extracted.cgst,
-                                'sgst': extracted.sgst,
-                                'igst': extracted.igst,
-                                'tax': extracted.tax,
-                                'total': extracted.total
-                            })
-                            continue
-                    
-                    sales_data.append({
-                        'invoice_number': extracted.invoice_number,
-                        'date': extracted.date,
-                        'vendor_name': extracted.vendor_name,
-                        'line_items': extracted.line_items,
-                        'additional_charges': extracted.additional_charges,
-                        'subtotal': extracted.subtotal,
-                        'cgst': extracted.cgst,
-                        'sgst': extracted.sgst,
-                        'igst': extracted.igst,
-                        'tax': extracted.tax,
-                        'total': extracted.total
-                    })
-                else:
-                    raise HTTPException(
-                        status_code=422,
-                        detail=f"Error reading file '{file.filename}': {parse_result.error_message}. Please upload a valid PDF or Excel."
-                    )
-            except HTTPException:
-                raise
+                parse_jobs.append((file.filename, True, asyncio.create_task(
+                    _run_in_process_pool(document_parser.parse, file_bytes, file.filename)
+                )))
             except Exception as e:
                 raise HTTPException(
                     status_code=422,
                     detail=f"Error processing file '{file.filename}': {str(e)}"
                 )
         
+        # Wait for every parse job before reporting errors, so a failed file
+        # doesn't leave other jobs running unobserved
+        parse_results = await asyncio.gather(
+            *(task for _, _, task in parse_jobs), return_exceptions=True
+        )
+        
+        # Collect parse results in upload order
+        for (filename, is_sales_file, _), parse_result in zip(parse_jobs, parse_results):
+            if isinstance(parse_result, BrokenProcessPool):
+                # Every job on the pool fails when one worker dies, so there
+                # is no way to tell which file caused it - don't blame one
+                raise HTTPException(
+                    status_code=422,
+                    detail="A worker process crashed while parsing the uploaded files. Please check that each file is a valid PDF or Excel and try again."
+                )
+            
+            if isinstance(parse_result, BaseException):
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Error processing file '{filename}': {str(parse_result)}"
+                )
+            
+            if not parse_result.success:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Error reading file '{filename}': {parse_result.error_message}. Please upload a valid PDF or Excel."
+                )
+            
+            parsed_bills.append((filename, parse_result, is_sales_file))
+        
+        # Extract all bills in a single batch (off the event loop)
+        extracted_list = await loop.run_in_executor(
+            None,
+            ai_extractor.extract_batch,
+            [(pr.text_content, pr.tables) for _, pr, _ in parsed_bills]
+        )
+        
+        for (filename, parse_result, is_sales_file), extracted in zip(parsed_bills, extracted_list):
+            # A failed extraction is empty, not a real bill - don't report it as one
+            if extracted.extraction_failed:
+                raise HTTPException(
+                    status_code=502,
+                    detail=f"Could not extract data from '{filename}': the AI service request failed. Please try again."
+                )
+            
+            if not is_sales_file:
+                purchase_data.append(BillRecord.from_extracted(extracted))
+                continue
+            
+            # Auto-detect bill type if enabled
+            if auto_detect:
+                detected_type = inventory_analyzer.detect_bill_type(
+                    parse_result.text_content
+                )
+                # Override if detected as purchase
+                if detected_type.value == 'purchase':
+                    purchase_data.append(BillRecord.from_extracted(extracted))
+                    continue
+            
+            sales_data.append(BillRecord.from_extracted(extracted))
+        
         # Check if we have any data
         if not purchase_data and not sales_data:
             raise HTTPException(
@@ -268,28 +383,29 @@ async def analyze_bills(
         # Perform inventory analysis
         analysis = inventory_analyzer.analyze(purchase_data, sales_data)
         
-        # Generate Excel report
-        excel_bytes = excel_generator.generate_analysis_report(
+        # Generate Excel report (off the event loop)
+        excel_bytes = await _run_in_process_pool(
+            excel_generator.generate_analysis_report,
             analysis,
             purchase_data,
             sales_data
         )
         
         # Generate filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = _filename_timestamp(int(time.time()))
         output_filename = f"inventory_analysis_{timestamp}.xlsx"
         
         # Build response headers
         response_headers = {
             "Content-Disposition": f'attachment; filename="{output_filename}"',
-            "Content-Length": str(len(excel_bytes)),
             "Cache-Control": "no-store, no-cache, must-revalidate, max-age=0",
             "Pragma": "no-cache"
         }
         
-        # Return streaming response
-        return StreamingResponse(
-            io.BytesIO(excel_bytes),
+        # Return the report as a single body so GZip's size threshold applies
+        # and Content-Length is set (a streamed body is always gzipped)
+        return Response(
+            content=excel_bytes,
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             headers=response_headers
         )
@@ -307,6 +423,9 @@ async def analyze_bills(
         )
         
     finally:
+        # Don't leave parse jobs running if we bailed out before collecting them
+        for _, _, task in parse_jobs:
+            task.cancel()
         gc.collect()
 
 
@@ -321,13 +440,14 @@ async def http_exception_handler(request, exc):
     
     Returns clean JSON errors without exposing internals.
     """
-    return JSONResponse(
+    return Response(
         status_code=exc.status_code,
-        content={
+        content=orjson.dumps({
             "success": False,
             "error": exc.detail,
             "status_code": exc.status_code
-        }
+        }),
+        media_type="application/json"
     )
 
 
@@ -338,13 +458,14 @@ async def general_exception_handler(request, exc):
     
     Never exposes internal error details for privacy/security.
     """
-    return JSONResponse(
+    return Response(
         status_code=500,
-        content={
+        content=orjson.dumps({
             "success": False,
             "error": "An unexpected error occurred. Please try again.",
             "status_code": 500
-        }
+        }),
+        media_type="application/json"
     )
 
 
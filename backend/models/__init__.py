@@ -1,7 +1,7 @@
 """
 Models Module
 =============
-Pydantic models for data validation.
+Pydantic models for data validation and records for bill processing.
 """
 
 from .user import (
@@ -12,6 +12,7 @@ from .user import (
     Token,
     TokenData
 )
+from .bill import BillRecord
 
 __all__ = [
     "UserCreate",
@@ -19,5 +20,6 @@ __all__ = [
     "UserResponse",
     "UserInDB",
     "Token",
-    "TokenData"
+    "TokenData",
+    "BillRecord"
 ]
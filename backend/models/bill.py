@@ -0,0 +1,57 @@
+"""
+Bill Models
+===========
+Lightweight records for bills collected during analysis.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(slots=True, frozen=True)
+class BillRecord:
+    """
+    Extracted bill data passed to the analyzer and Excel generator.
+    
+    Supports dict-style `get()` so existing consumers that read
+    bills as dictionaries keep working unchanged.
+    """
+    invoice_number: str = ""
+    date: str = ""
+    vendor_name: str = ""
+    line_items: Optional[list] = None
+    additional_charges: Optional[list] = None
+    subtotal: float = 0.0
+    cgst: float = 0.0
+    sgst: float = 0.0
+    igst: float = 0.0
+    tax: float = 0.0
+    total: float = 0.0
+    
+    @classmethod
+    def from_extracted(cls, extracted) -> "BillRecord":
+        """Build a record from an ExtractedData object."""
+        return cls(
+            extracted.invoice_number,
+            extracted.date,
+            extracted.vendor_name,
+            extracted.line_items,
+            extracted.additional_charges,
+            extracted.subtotal,
+            extracted.cgst,
+            extracted.sgst,
+            extracted.igst,
+            extracted.tax,
+            extracted.total
+        )
+    
+    def get(self, key: str, default=None):
+        """
+        Dict-style access to a field.
+        
+        Unlike dict.get, default is also returned when the field exists
+        but holds None (e.g. bill.get('line_items', []) gives [] for a
+        record built without line items).
+        """
+        value = getattr(self, key, None)
+        return default if value is None else value
@@ -1,4 +1,4 @@
 # Document parser module
-from .document_parser import DocumentParser, ParseResult
+from .document_parser import DocumentParser, ParseResult, ParseMode
 
-__all__ = ["DocumentParser", "ParseResult"]
+__all__ = ["DocumentParser", "ParseResult", "ParseMode"]
@@ -10,12 +10,13 @@ No data is written to disk at any point.
 
 import io
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import TYPE_CHECKING, BinaryIO, Iterator, Optional, Tuple, Union
 from enum import Enum
 
-import pandas as pd
-# import pdfplumber
-# from PIL import Image
+# Heavy libraries (pandas, python-calamine, openpyxl, pymupdf, pdfplumber)
+# are imported inside the methods that need them to keep startup fast.
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class FileType(Enum):
@@ -26,6 +27,12 @@ class FileType(Enum):
     UNKNOWN = "unknown"
 
 
+class ParseMode(Enum):
+    """How much structure to extract from PDFs."""
+    TEXT_ONLY = "text_only"  # Page text only (what the AI extractor needs)
+    FULL = "full"            # Page text plus detected tables
+
+
 @dataclass
 class ParseResult:
     """
@@ -58,20 +65,21 @@ class DocumentParser:
     """
     
     # File signature (magic bytes) mapping for type detection
-    # These are the first few bytes that identify file formats
+    # Keyed on the first 4 bytes so detection is a single dict lookup
     FILE_SIGNATURES = {
         # ZIP-based formats (xlsx, docx, etc.)
         b'PK\x03\x04': FileType.EXCEL,
         # PDF signature
         b'%PDF': FileType.PDF,
-        # JPEG signature
-        b'\xff\xd8\xff': FileType.IMAGE,
         # PNG signature
         b'\x89PNG': FileType.IMAGE,
         # Old Excel format (.xls)
         b'\xd0\xcf\x11\xe0': FileType.EXCEL,
     }
     
+    # JPEG signature is only 3 bytes, so it is checked separately
+    JPEG_SIGNATURE = b'\xff\xd8\xff'
+    
     def detect_file_type(self, file_bytes: bytes) -> FileType:
         """
         Detect file type from magic bytes (file signature).
@@ -82,24 +90,38 @@ class DocumentParser:
         Returns:
             FileType enum indicating the detected format
         """
-        for signature, file_type in self.FILE_SIGNATURES.items():
-            if file_bytes.startswith(signature):
-                return file_type
+        file_type = self.FILE_SIGNATURES.get(file_bytes[:4])
+        if file_type is not None:
+            return file_type
+        if file_bytes[:3] == self.JPEG_SIGNATURE:
+            return FileType.IMAGE
         return FileType.UNKNOWN
     
-    def parse(self, file_bytes: bytes, filename: str = "") -> ParseResult:
+    def parse(
+        self,
+        file: Union[bytes, BinaryIO],
+        filename: str = "",
+        mode: ParseMode = ParseMode.TEXT_ONLY
+    ) -> ParseResult:
         """
         Parse uploaded document and extract content.
         
         Args:
-            file_bytes: Raw bytes of the uploaded file
+            file: Raw bytes of the uploaded file, or a seekable binary file
+                object (e.g. UploadFile.file) which Excel readers consume directly
             filename: Original filename (used as fallback for type detection)
+            mode: TEXT_ONLY skips PDF table detection; FULL also extracts tables
             
         Returns:
             ParseResult containing extracted text and tables
         """
-        # Detect file type from bytes
-        file_type = self.detect_file_type(file_bytes)
+        # Detect file type from the leading bytes (peek, then rewind file objects)
+        if isinstance(file, (bytes, bytearray)):
+            header = file[:8]
+        else:
+            header = file.read(8)
+            file.seek(0)
+        file_type = self.detect_file_type(header)
         
         # Fallback: Use filename extension if magic bytes detection fails
         if file_type == FileType.UNKNOWN and filename:
@@ -114,11 +136,13 @@ class DocumentParser:
         # Route to appropriate parser
         try:
             if file_type == FileType.EXCEL:
-                return self._parse_excel(file_bytes)
+                return self._parse_excel(file)
             elif file_type == FileType.PDF:
-                return self._parse_pdf(file_bytes)
+                # PDF readers need the whole document in memory anyway
+                file_bytes = file if isinstance(file, (bytes, bytearray)) else file.read()
+                return self._parse_pdf(file_bytes, mode)
             elif file_type == FileType.IMAGE:
-                return self._parse_image(file_bytes)
+                return self._parse_image(file)
             else:
                 return ParseResult(
                     success=False,
@@ -132,35 +156,27 @@ class DocumentParser:
                 error_message=f"Failed to parse document: {str(e)}"
             )
     
-    def _parse_excel(self, file_bytes: bytes) -> ParseResult:
+    def _parse_excel(self, file: Union[bytes, BinaryIO]) -> ParseResult:
         """
         Parse Excel file and extract all sheets as tables.
         
-        Uses pandas for reading directly from BytesIO buffer.
-        Each sheet becomes a separate DataFrame in the tables list.
+        Uses the Rust-backed python-calamine reader directly on the file
+        object (raw bytes get a BytesIO view), falling back to openpyxl in
+        read-only mode if calamine fails. Sheets are read one at a time;
+        each becomes a separate DataFrame in the tables list.
         """
-        buffer = io.BytesIO(file_bytes)
-        tables = []
-        text_parts = []
+        owns_buffer = isinstance(file, (bytes, bytearray))
+        buffer = io.BytesIO(file) if owns_buffer else file
         
         try:
-            # Read all sheets from the Excel file
-            excel_data = pd.read_excel(buffer, sheet_name=None, engine='openpyxl')
-            
-            for sheet_name, df in excel_data.items():
-                # Skip empty sheets
-                if df.empty:
-                    continue
-                    
-                # Store the DataFrame
-                tables.append({
-                    'sheet_name': sheet_name,
-                    'data': df
-                })
-                
-                # Convert to text representation for extraction
-                text_parts.append(f"=== Sheet: {sheet_name} ===")
-                text_parts.append(df.to_string(index=False))
+            # Read every sheet inside the try, so errors while reading a
+            # sheet (not just opening the workbook) also trigger the fallback
+            try:
+                tables, text_parts = self._read_excel_sheets(self._iter_sheets_calamine(buffer))
+            except Exception as e:
+                print(f"[EXCEL_PARSER] Calamine failed ({e}), falling back to openpyxl")
+                buffer.seek(0)
+                tables, text_parts = self._read_excel_sheets(self._iter_sheets_openpyxl(buffer))
             
             return ParseResult(
                 success=True,
@@ -169,33 +185,116 @@ class DocumentParser:
                 tables=tables
             )
         finally:
-            # Clear buffer from memory
-            buffer.close()
+            # Clear our own buffer from memory (caller-owned files stay open)
+            if owns_buffer:
+                buffer.close()
     
-    def _parse_pdf(self, file_bytes: bytes) -> ParseResult:
+    def _read_excel_sheets(self, sheets: Iterator[Tuple[str, "pd.DataFrame"]]) -> Tuple[list, list]:
         """
-        Parse PDF and extract text using pdfplumber.
-        (Restored by user request for better accuracy).
+        Collect non-empty sheets as tables plus their text representation.
+        
+        Returns:
+            Tuple of (tables as {'sheet_name', 'data'} dicts, text parts)
         """
-        buffer = io.BytesIO(file_bytes)
-        text_content = []
         tables = []
-
+        text_parts = []
+        
+        for sheet_name, df in sheets:
+            # Skip empty sheets
+            if df.empty:
+                continue
+                
+            # Store the DataFrame
+            tables.append({
+                'sheet_name': sheet_name,
+                'data': df
+            })
+            
+            # Convert to text representation for extraction
+            # (tab-separated via pandas' C writer, much faster than to_string)
+            text_buffer = io.StringIO()
+            df.to_csv(text_buffer, sep='\t', index=False)
+            text_parts.append(f"=== Sheet: {sheet_name} ===")
+            text_parts.append(text_buffer.getvalue())
+        
+        return tables, text_parts
+    
+    def _iter_sheets_calamine(self, buffer: BinaryIO) -> Iterator[Tuple[str, "pd.DataFrame"]]:
+        """
+        Open the workbook with python-calamine and read sheets one at a time.
+        
+        The workbook is opened eagerly so unsupported files fail early.
+        
+        Returns:
+            Iterator of (sheet name, DataFrame) with the first row as header
+        """
+        import pandas as pd
+        from python_calamine import CalamineWorkbook
+        
+        workbook = CalamineWorkbook.from_filelike(buffer)
+        
+        def normalize(value):
+            # Match openpyxl's cell values: calamine returns every number as
+            # float ("2.0" instead of "2") and empty cells as '' instead of None
+            if isinstance(value, float) and value.is_integer():
+                return int(value)
+            if value == '':
+                return None
+            return value
+        
+        def read_sheets():
+            for sheet_name in workbook.sheet_names:
+                rows = workbook.get_sheet_by_name(sheet_name).to_python(skip_empty_area=True)
+                if not rows:
+                    yield sheet_name, pd.DataFrame()
+                    continue
+                rows = [[normalize(value) for value in row] for row in rows]
+                yield sheet_name, pd.DataFrame(rows[1:], columns=rows[0])
+        
+        return read_sheets()
+    
+    def _iter_sheets_openpyxl(self, buffer: BinaryIO) -> Iterator[Tuple[str, "pd.DataFrame"]]:
+        """
+        Open the workbook with openpyxl in read-only mode and stream sheets.
+        
+        Rows are pulled with iter_rows(values_only=True) so no cell objects
+        are built. The workbook is closed once iteration finishes.
+        
+        Returns:
+            Iterator of (sheet name, DataFrame) with the first row as header
+        """
+        import pandas as pd
+        from openpyxl import load_workbook
+        
+        workbook = load_workbook(buffer, read_only=True, data_only=True)
+        
+        def read_sheets():
+            try:
+                for ws in workbook.worksheets:
+                    rows = ws.iter_rows(values_only=True)
+                    header = next(rows, None)
+                    if header is None:
+                        yield ws.title, pd.DataFrame()
+                        continue
+                    yield ws.title, pd.DataFrame.from_records(rows, columns=header)
+            finally:
+                workbook.close()
+        
+        return read_sheets()
+    
+    def _parse_pdf(self, file_bytes: bytes, mode: ParseMode = ParseMode.TEXT_ONLY) -> ParseResult:
+        """
+        Parse PDF and extract text using PyMuPDF (MuPDF C library).
+        Falls back to pdfplumber if MuPDF cannot open the document.
+        
+        Table detection only runs in FULL mode.
+        """
         try:
-            import pdfplumber
-            with pdfplumber.open(buffer) as pdf:
-                for page in pdf.pages:
-                    # Extract text
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_content.append(page_text)
-
-                    # Extract tables (Optional, kept for structure if needed later)
-                    # page_tables = page.extract_tables()
-                    # for table in page_tables:
-                    #     if table:
-                    #         df = pd.DataFrame(table[1:], columns=table[0])
-                    #         tables.append(df)
+            try:
+                text_content, tables = self._extract_pdf_pymupdf(file_bytes, mode)
+            except Exception as e:
+                print(f"[PDF_PARSER] PyMuPDF failed ({e}), falling back to pdfplumber")
+                text_content, tables = self._extract_pdf_pdfplumber(file_bytes, mode)
 
             full_text = "\n".join(text_content).strip()
             print(f"DEBUG: Extracted text length: {len(full_text)}")
@@ -224,10 +323,73 @@ class DocumentParser:
                 file_type=FileType.PDF,
                 error_message=f"PDF parsing failed: {str(e)}"
             )
+
+    def _extract_pdf_pymupdf(self, file_bytes: bytes, mode: ParseMode) -> Tuple[list, list]:
+        """
+        Extract text (and tables in FULL mode) from each page with PyMuPDF.
+        
+        Text uses PyMuPDF's default text flags minus ligature preservation,
+        so ligature glyphs (such as the single-glyph "fi") come out as plain
+        letters for the extractor. This applies in both modes.
+        
+        Returns:
+            Tuple of (non-empty page texts in page order, tables as DataFrames)
+        """
+        import pymupdf
+
+        text_flags = pymupdf.TEXTFLAGS_TEXT & ~pymupdf.TEXT_PRESERVE_LIGATURES
+        text_content = []
+        tables = []
+
+        with pymupdf.open(stream=file_bytes, filetype="pdf") as doc:
+            for page in doc:
+                page_text = page.get_text("text", flags=text_flags)
+                if page_text:
+                    text_content.append(page_text)
+
+                if mode == ParseMode.FULL:
+                    for table in page.find_tables().tables:
+                        df = table.to_pandas()
+                        if not df.empty:
+                            tables.append(df)
+
+        return text_content, tables
+
+    def _extract_pdf_pdfplumber(self, file_bytes: bytes, mode: ParseMode) -> Tuple[list, list]:
+        """
+        Extract text (and tables in FULL mode) from each page with pdfplumber.
+        Used as the fallback path.
+        
+        Returns:
+            Tuple of (non-empty page texts in page order, tables as DataFrames)
+        """
+        import pandas as pd
+        import pdfplumber
+
+        buffer = io.BytesIO(file_bytes)
+        text_content = []
+        tables = []
+
+        try:
+            with pdfplumber.open(buffer) as pdf:
+                for page in pdf.pages:
+                    # Extract text
+                    page_text = page.extract_text()
+                    if page_text:
+                        text_content.append(page_text)
+
+                    # Extract tables
+                    if mode == ParseMode.FULL:
+                        for table in page.extract_tables():
+                            if table:
+                                df = pd.DataFrame(table[1:], columns=table[0])
+                                tables.append(df)
         finally:
             buffer.close()
 
-    def _parse_image(self, file_bytes: bytes) -> ParseResult:
+        return text_content, tables
+
+    def _parse_image(self, file: Union[bytes, BinaryIO]) -> ParseResult:
         """
         Image parsing is DISABLED.
         """
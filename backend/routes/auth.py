@@ -5,11 +5,13 @@ Handles user login, registration (admin only), and user management.
 Implements single-session enforcement (one device at a time).
 """
 
+import asyncio
 from datetime import datetime, timedelta
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from pymongo.errors import DuplicateKeyError
 
 from auth.database import get_users_collection
 from auth.security import verify_password, get_password_hash, create_access_token
@@ -21,6 +23,9 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 # Session timeout in hours (user can login again after this time of inactivity)
 SESSION_TIMEOUT_HOURS = 24
 
+# Minimum seconds between last_activity writes from /auth/me polling
+ACTIVITY_UPDATE_INTERVAL_SECONDS = 60
+
 
 def is_session_active(user: dict) -> bool:
     """
@@ -63,8 +68,8 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Verify password
-    if not verify_password(form_data.password, user["password_hash"]):
+    # Verify password (bcrypt is CPU-heavy, run it off the event loop)
+    if not await asyncio.to_thread(verify_password, form_data.password, user["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -143,10 +148,19 @@ async def get_current_user_info(current_user: dict = Depends(get_current_user)):
     Also updates last_activity to keep session alive.
     """
     # Update last activity (keeps session alive)
+    # Only writes if the stored value is older than the update interval,
+    # so frequent polling doesn't cause a write on every call
+    now = datetime.utcnow()
     users_collection = await get_users_collection()
     await users_collection.update_one(
-        {"username": current_user["username"]},
-        {"$set": {"last_activity": datetime.utcnow()}}
+        {
+            "username": current_user["username"],
+            "$or": [
+                {"last_activity": None},
+                {"last_activity": {"$lt": now - timedelta(seconds=ACTIVITY_UPDATE_INTERVAL_SECONDS)}}
+            ]
+        },
+        {"$set": {"last_activity": now}}
     )
     
     return {
@@ -171,27 +185,29 @@ async def register_user(
     """
     users_collection = await get_users_collection()
     
-    # Check if username already exists
-    existing_user = await users_collection.find_one({"username": user_data.username})
-    if existing_user:
+    # Check if username or email already exists (single query)
+    conflict = await users_collection.find_one(
+        {"$or": [{"username": user_data.username}, {"email": user_data.email}]},
+        projection={"username": 1, "email": 1}
+    )
+    if conflict:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already registered"
+            detail=(
+                "Username already registered"
+                if conflict.get("username") == user_data.username
+                else "Email already registered"
+            )
         )
     
-    # Check if email already exists
-    existing_email = await users_collection.find_one({"email": user_data.email})
-    if existing_email:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
+    # Hash password off the event loop (bcrypt is CPU-heavy)
+    password_hash = await asyncio.to_thread(get_password_hash, user_data.password)
     
     # Create user document
     user_doc = {
         "username": user_data.username,
         "email": user_data.email,
-        "password_hash": get_password_hash(user_data.password),
+        "password_hash": password_hash,
         "role": user_data.role,
         "is_active": True,
         "is_logged_in": False,
@@ -201,7 +217,15 @@ async def register_user(
     }
     
     # Insert into database
-    result = await users_collection.insert_one(user_doc)
+    # (unique indexes on username/email also reject concurrent duplicates)
+    try:
+        result = await users_collection.insert_one(user_doc)
+    except DuplicateKeyError as e:
+        duplicate_field = "email" if "email" in (e.details or {}).get("keyPattern", {}) else "username"
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{duplicate_field.capitalize()} already registered"
+        )
     
     return {
         "message": "User created successfully",
@@ -221,15 +245,36 @@ async def list_users(current_admin: dict = Depends(get_current_admin_user)):
     """
     users_collection = await get_users_collection()
     
+    # Session status is computed by MongoDB (same rule as is_session_active)
+    session_cutoff = datetime.utcnow() - timedelta(hours=SESSION_TIMEOUT_HOURS)
+    pipeline = [
+        {
+            "$project": {
+                "username": 1,
+                "email": 1,
+                "role": 1,
+                "is_active": {"$ifNull": ["$is_active", True]},
+                "last_activity": 1,
+                "created_at": 1,
+                "session_active": {
+                    "$and": [
+                        {"$eq": ["$is_logged_in", True]},
+                        {"$gt": ["$last_activity", session_cutoff]}
+                    ]
+                }
+            }
+        }
+    ]
+    
     users = []
-    async for user in users_collection.find():
+    async for user in users_collection.aggregate(pipeline):
         users.append({
             "id": str(user["_id"]),
             "username": user["username"],
             "email": user["email"],
             "role": user["role"],
-            "is_active": user.get("is_active", True),
-            "is_logged_in": is_session_active(user),
+            "is_active": user["is_active"],
+            "is_logged_in": user["session_active"],
             "last_activity": user.get("last_activity"),
             "created_at": user.get("created_at")
         })
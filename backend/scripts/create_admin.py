@@ -49,15 +49,6 @@ async def create_admin():
     db = client[MONGODB_DB_NAME]
     users_collection = db["users"]
     
-    # Check if any admin already exists
-    existing_admin = await users_collection.find_one({"role": "admin"})
-    if existing_admin:
-        print(f"⚠️  An admin account already exists: {existing_admin['username']}")
-        response = input("Do you want to create another admin? (y/n): ").strip().lower()
-        if response != 'y':
-            print("Cancelled.")
-            return
-    
     # Get admin details
     print("Enter details for the new admin account:\n")
     
@@ -66,23 +57,35 @@ async def create_admin():
         print("❌ Username must be at least 3 characters.")
         return
     
-    # Check if username exists
-    existing_user = await users_collection.find_one({"username": username})
-    if existing_user:
-        print(f"❌ Username '{username}' already exists.")
-        return
-    
     email = input("Email: ").strip()
     if not email or "@" not in email:
         print("❌ Invalid email address.")
         return
     
-    # Check if email exists
-    existing_email = await users_collection.find_one({"email": email})
-    if existing_email:
+    # Check existing admins, username and email in a single query
+    conflicts = [
+        doc async for doc in users_collection.find(
+            {"$or": [{"role": "admin"}, {"username": username}, {"email": email}]},
+            {"username": 1, "email": 1, "role": 1}
+        )
+    ]
+    
+    if any(doc.get("username") == username for doc in conflicts):
+        print(f"❌ Username '{username}' already exists.")
+        return
+    
+    if any(doc.get("email") == email for doc in conflicts):
         print(f"❌ Email '{email}' already exists.")
         return
     
+    existing_admin = next((doc for doc in conflicts if doc.get("role") == "admin"), None)
+    if existing_admin:
+        print(f"⚠️  An admin account already exists: {existing_admin['username']}")
+        response = input("Do you want to create another admin? (y/n): ").strip().lower()
+        if response != 'y':
+            print("Cancelled.")
+            return
+    
     password = getpass("Password (min 6 chars): ")
     if len(password) < 6:
         print("❌ Password must be at least 6 characters.")
@@ -97,7 +100,7 @@ async def create_admin():
     admin_doc = {
         "username": username,
         "email": email,
-        "password_hash": hash_password(password),
+        "password_hash": await asyncio.to_thread(hash_password, password),
         "role": "admin",
         "is_active": True,
         "created_at": datetime.utcnow(),
@@ -39,15 +39,22 @@ async def create_user():
         db = client.get_default_database("dattu_bill")
         users_collection = db["users"]
         
-        # Check existing
-        if await users_collection.find_one({"username": username}):
-            print(f"Error: User '{username}' already exists!")
+        # Check existing username or email (single query)
+        existing = await users_collection.find_one(
+            {"$or": [{"username": username}, {"email": email}]},
+            {"username": 1, "email": 1}
+        )
+        if existing:
+            if existing.get("username") == username:
+                print(f"Error: User '{username}' already exists!")
+            else:
+                print(f"Error: Email '{email}' already exists!")
             return
             
         user_doc = {
             "username": username,
             "email": email,
-            "password_hash": get_password_hash(password),
+            "password_hash": await asyncio.to_thread(get_password_hash, password),
             "role": "admin",
             "is_active": True,
             "is_logged_in": False,
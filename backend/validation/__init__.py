@@ -1,4 +1,4 @@
 # Validation engine module
-from .validator import Validator, ValidationResult
+from .validator import Validator, ValidationResult, DEFAULT_VALIDATOR
 
-__all__ = ["Validator", "ValidationResult"]
+__all__ = ["Validator", "ValidationResult", "DEFAULT_VALIDATOR"]
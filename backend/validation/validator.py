@@ -11,32 +11,46 @@ Validation Rules:
 All validation is performed in-memory. No data is logged or stored.
 """
 
-from dataclasses import dataclass, field
-from typing import List
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Optional
+
 from extraction import ExtractedData
 
 
-@dataclass
+# Line item message templates (formatted only when a check fails)
+MSG_ITEM_NAME_EMPTY = "Line item {}: Item name is empty"
+MSG_QUANTITY_NEGATIVE = "Line item {}: Quantity cannot be negative"
+MSG_RATE_NEGATIVE = "Line item {}: Rate cannot be negative"
+MSG_AMOUNT_NEGATIVE = "Line item {}: Amount cannot be negative"
+MSG_NO_PRICE_DATA = "No price data could be extracted from the document"
+
+
+@dataclass(slots=True)
 class ValidationResult:
     """
     Result of data validation.
     
     Attributes:
         is_valid: Whether all validation rules passed
-        errors: List of error messages for failed rules
-        warnings: List of warning messages for minor issues
+        errors: Error messages for failed rules (None until the first error)
+        warnings: Warning messages for minor issues (None until the first warning)
     """
     is_valid: bool = True
-    errors: List[str] = field(default_factory=list)
-    warnings: List[str] = field(default_factory=list)
+    errors: Optional[Deque[str]] = None
+    warnings: Optional[Deque[str]] = None
     
     def add_error(self, message: str):
         """Add an error and mark result as invalid."""
+        if self.errors is None:
+            self.errors = deque()
         self.errors.append(message)
         self.is_valid = False
     
     def add_warning(self, message: str):
         """Add a warning (does not affect validity)."""
+        if self.warnings is None:
+            self.warnings = deque()
         self.warnings.append(message)
 
 
@@ -97,24 +111,28 @@ class Validator:
         
         for i, item in enumerate(data.line_items, 1):
             # Check item name
-            if not item.item_name or item.item_name.strip() == '':
-                result.add_warning(f"Line item {i}: Item name is empty")
+            name = item.item_name
+            if not name or name.isspace():
+                result.add_warning(MSG_ITEM_NAME_EMPTY.format(i))
             
             # Check quantity
             if item.quantity < 0:
-                result.add_error(f"Line item {i}: Quantity cannot be negative")
+                result.add_error(MSG_QUANTITY_NEGATIVE.format(i))
             
             # Check rate (warning only - may not always be present)
             if item.rate < 0:
-                result.add_error(f"Line item {i}: Rate cannot be negative")
+                result.add_error(MSG_RATE_NEGATIVE.format(i))
             elif item.rate == 0:
                 items_without_prices += 1
             
             # Check amount (warning only)
             if item.amount < 0:
-                result.add_error(f"Line item {i}: Amount cannot be negative")
+                result.add_error(MSG_AMOUNT_NEGATIVE.format(i))
         
         # Add a single warning if many items are missing prices
         if items_without_prices > 0 and items_without_prices == len(data.line_items):
-            result.add_warning("No price data could be extracted from the document")
+            result.add_warning(MSG_NO_PRICE_DATA)
+
 
+# Shared instance (Validator is stateless, so one is enough per process)
+DEFAULT_VALIDATOR = Validator()